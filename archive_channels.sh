@@ -9,6 +9,10 @@ set -euo pipefail
 MODE="${1:-batch}"  # 'csv' (process from CSV) or 'batch' (user-defined 50 channels)
 LOGFILE="archive_log_$(date +%Y%m%d_%H%M%S).log"
 DRY_RUN="${DRY_RUN:-false}"
+MAX_PARALLEL="${MAX_PARALLEL:-5}"  # concurrent archive requests in flight
+RATE_LIMIT_DELAY="${RATE_LIMIT_DELAY:-0.5}"  # seconds between request starts
+MAX_RETRIES="${MAX_RETRIES:-3}"  # retries per channel when Slack returns HTTP 429
+AUTO_CONFIRM="${AUTO_CONFIRM:-false}"  # answer 'yes' to every CSV batch prompt (unattended runs)
 
 # File paths for CSV mode
 CSV_TO_ARCHIVE="${CSV_TO_ARCHIVE:-channels_to_archive.csv}"
@@ -19,6 +23,7 @@ echo "==========================================="
 echo "🔧 Mode: $MODE"
 echo "📝 Log File: $LOGFILE"
 echo "🛡️  Dry Run Mode: $DRY_RUN"
+echo "⚡ Parallel Workers: $MAX_PARALLEL"
 echo ""
 
 # User-defined batch of 50 channels - Format: "CHANNEL_ID:CHANNEL_NAME" 
@@ -28,6 +33,22 @@ USER_BATCH_50=(
     # TODO: User adds their 50 channel IDs here
 )
 
+# Validate tuning settings
+if [[ ! "$MAX_PARALLEL" =~ ^[1-9][0-9]*$ ]]; then
+    echo "❌ ERROR: MAX_PARALLEL must be a positive integer (got '$MAX_PARALLEL')" >&2
+    exit 1
+fi
+
+if [[ ! "$RATE_LIMIT_DELAY" =~ ^([0-9]+(\.[0-9]+)?|\.[0-9]+)$ ]]; then
+    echo "❌ ERROR: RATE_LIMIT_DELAY must be a non-negative number of seconds (got '$RATE_LIMIT_DELAY')" >&2
+    exit 1
+fi
+
+if [[ ! "$MAX_RETRIES" =~ ^[0-9]+$ ]]; then
+    echo "❌ ERROR: MAX_RETRIES must be a non-negative integer (got '$MAX_RETRIES')" >&2
+    exit 1
+fi
+
 # Validate mode
 if [[ "$MODE" == "csv" ]]; then
     echo "📋 CSV MODE: Process channels from CSV files in batches of 50"
@@ -43,6 +64,14 @@ if [[ "$MODE" == "csv" ]]; then
         echo "❌ ERROR: Master list file not found: $CSV_MASTER_LIST" >&2
         exit 1
     fi
+    
+    # Batch confirmations are read from the terminal, so unattended runs
+    # (cron, CI, piped input) must opt in with AUTO_CONFIRM=true
+    if [[ "$DRY_RUN" != "true" && "$AUTO_CONFIRM" != "true" ]] && ! { : </dev/tty; } 2>/dev/null; then
+        echo "❌ ERROR: No terminal available for batch confirmations" >&2
+        echo "   Set AUTO_CONFIRM=true to archive every batch without prompting" >&2
+        exit 1
+    fi
 elif [[ "$MODE" == "batch" ]]; then
     if [[ ${#USER_BATCH_50[@]} -eq 0 ]]; then
         echo "⚠️  WARNING: USER_BATCH_50[] array is empty!"
@@ -55,88 +84,154 @@ else
     exit 1
 fi
 
+# Print a message and append it to the log file. Uses the log file descriptor
+# opened once at startup instead of piping every line through tee.
+log() {
+    echo "$*"
+    echo "$*" >&3
+}
+
+# Store the current HH:MM:SS in the named variable. bash 4.2+ formats the time
+# itself; older bash (e.g. macOS /bin/bash) falls back to running date.
+if (( BASH_VERSINFO[0] * 100 + BASH_VERSINFO[1] >= 402 )); then
+    log_time() { printf -v "$1" '%(%H:%M:%S)T' -1; }
+else
+    log_time() { printf -v "$1" '%s' "$(date '+%H:%M:%S')"; }
+fi
+
 # Archive function with comprehensive error handling
 archive_channel() {
     local channel_name="$1"
     local channel_id="$2"
+    local now
+    log_time now
     
-    echo "[$(date '+%H:%M:%S')] Processing: $channel_name ($channel_id)" | tee -a "$LOGFILE"
+    log "[$now] Processing: $channel_name ($channel_id)"
+    
+    # Reject malformed IDs locally before spending a rate-limited request on them
+    if [[ "$channel_id" != [CG]* || "$channel_id" == *[![:upper:][:digit:]]* ]]; then
+        log "  ❌ INVALID ID: $channel_name - '$channel_id' is not a channel ID"
+        return 1
+    fi
     
     if [[ "$DRY_RUN" == "true" ]]; then
-        echo "  [DRY RUN] Would archive channel: $channel_id" | tee -a "$LOGFILE"
+        log "  [DRY RUN] Would archive channel: $channel_id"
         return 0
     fi
     
-    local resp
-    resp=$(curl -sS -X POST "https://slack.com/api/conversations.archive" \
-        -H "Authorization: Bearer ${SLACK_TOKEN}" \
-        -H "Content-Type: application/x-www-form-urlencoded" \
-        --data-urlencode "channel=${channel_id}")
+    # Archive directly without a conversations.info pre-check: one request per
+    # channel, with already-archived channels handled via the error below
+    local headers
+    headers=$(mktemp)
+    local attempt=0
+    local resp status retry_after
+    while true; do
+        resp=$(curl -sS -D "$headers" -w '\n%{http_code}' -X POST "https://slack.com/api/conversations.archive" \
+            -H "Authorization: Bearer ${SLACK_TOKEN}" \
+            -H "Content-Type: application/x-www-form-urlencoded" \
+            --data-urlencode "channel=${channel_id}") || {
+            rm -f "$headers"
+            log "  ❌ FAILED: $channel_name - request error"
+            return 1
+        }
+        status="${resp##*$'\n'}"
+        resp="${resp%$'\n'*}"
+        
+        if [[ "$status" != "429" ]] || (( attempt >= MAX_RETRIES )); then
+            break
+        fi
+        
+        # Rate limited: wait as long as Slack's Retry-After header asks, then retry
+        attempt=$((attempt + 1))
+        retry_after=$(awk -F': *' 'tolower($1) == "retry-after" { print $2 + 0 }' "$headers")
+        log "  ⏳ RATE LIMITED: $channel_name - retrying in ${retry_after:-1}s ($attempt/$MAX_RETRIES)"
+        sleep "${retry_after:-1}"
+    done
+    rm -f "$headers"
     
-    local ok
-    ok=$(echo "$resp" | jq -r '.ok // false')
+    # Decode the response once, pulling out both fields as "<ok> <error>".
+    # Non-JSON bodies (e.g. a 5xx HTML page) still end in a logged FAILED line;
+    # jq prints nothing for an empty body, so treat empty output the same way.
+    local parsed
+    parsed=$(echo "$resp" | jq -r '"\(.ok // false) \(.error // "unknown_error")"' 2>/dev/null) || parsed=""
+    [[ -n "$parsed" ]] || parsed="false invalid_response (HTTP $status)"
+    local ok="${parsed%% *}"
+    local error="${parsed#* }"
     
     if [[ "$ok" == "true" ]]; then
-        echo "  ✅ SUCCESS: Archived $channel_name" | tee -a "$LOGFILE"
+        log "  ✅ SUCCESS: Archived $channel_name"
         return 0
     fi
     
-    local error
-    error=$(echo "$resp" | jq -r '.error // "unknown_error"')
-    
     case "$error" in
         "already_archived")
-            echo "  ✅ ALREADY ARCHIVED: $channel_name" | tee -a "$LOGFILE"
+            log "  ✅ ALREADY ARCHIVED: $channel_name"
             return 0
             ;;
         "channel_not_found")
-            echo "  ⚠️  CHANNEL NOT FOUND: $channel_name (may have been deleted)" | tee -a "$LOGFILE"
+            log "  ⚠️  CHANNEL NOT FOUND: $channel_name (may have been deleted)"
             return 0
             ;;
         "missing_scope")
-            echo "  ❌ PERMISSION ERROR: $channel_name - Missing required scope" | tee -a "$LOGFILE"
+            log "  ❌ PERMISSION ERROR: $channel_name - Missing required scope"
             return 1
             ;;
         *)
-            echo "  ❌ FAILED: $channel_name - $error" | tee -a "$LOGFILE"
+            log "  ❌ FAILED: $channel_name - $error"
             return 1
             ;;
     esac
 }
 
+# Block until fewer than MAX_PARALLEL archive jobs are running
+wait_for_slot() {
+    while (( $(jobs -rp | wc -l) >= MAX_PARALLEL )); do
+        sleep 0.1
+    done
+}
+
 # Process user-defined batch of 50
 process_user_batch() {
     local total_channels=${#USER_BATCH_50[@]}
     local current=0
     local success_count=0
     local fail_count=0
+    local pids=()
     
     echo "📦 Processing User Batch ($total_channels channels)"
     echo "=============================================="
     
     for channel_entry in "${USER_BATCH_50[@]}"; do
-        ((current++))
+        current=$((current + 1))
         
-        # Parse channel_id:channel_name format
-        if [[ "$channel_entry" =~ ^([^:]+):(.+)$ ]]; then
-            local channel_id="${BASH_REMATCH[1]}"
-            local channel_name="${BASH_REMATCH[2]}"
-        else
-            echo "❌ INVALID FORMAT: $channel_entry (expected ID:NAME)" | tee -a "$LOGFILE"
-            ((fail_count++))
+        # Parse channel_id:channel_name format by splitting on the first colon
+        local channel_id="${channel_entry%%:*}"
+        local channel_name="${channel_entry#*:}"
+        if [[ "$channel_entry" != *:* || -z "$channel_id" || -z "$channel_name" ]]; then
+            log "❌ INVALID FORMAT: $channel_entry (expected ID:NAME)"
+            fail_count=$((fail_count + 1))
             continue
         fi
         
         echo "[$current/$total_channels] Processing: $channel_name -> $channel_id"
         
-        if archive_channel "$channel_name" "$channel_id"; then
-            ((success_count++))
+        # Run up to MAX_PARALLEL requests concurrently so network latency overlaps
+        wait_for_slot
+        archive_channel "$channel_name" "$channel_id" &
+        pids+=("$!")
+        
+        # Rate limiting: space out request starts (~2 requests/second by default)
+        sleep "$RATE_LIMIT_DELAY"
+    done
+    
+    # Collect results from the background archive jobs
+    local pid
+    for pid in ${pids[@]+"${pids[@]}"}; do
+        if wait "$pid"; then
+            success_count=$((success_count + 1))
         else
-            ((fail_count++))
+            fail_count=$((fail_count + 1))
         fi
-        
-        # Rate limiting
-        sleep 0.5
     done
     
     echo ""
@@ -145,25 +240,68 @@ process_user_batch() {
     echo "   ❌ Failed: $fail_count"
 }
 
+# Pair each archive-list channel with its ID from the master list as "name,id"
+# (id empty when not found), dropping blank rows. The master list is loaded
+# once and looked up in memory rather than re-scanned with grep for every
+# channel. Master-list columns are located by their "Name"/"ID" headers,
+# falling back to the first two columns when the headers are absent. Cells in
+# either file may be double-quoted; quotes are stripped before matching.
+resolve_channel_ids() {
+    awk -F',' '
+        function unquote(v) { gsub(/"/, "", v); return v }
+        { sub(/\r$/, "") }
+        FILENAME == ARGV[1] && FNR == 1 {
+            name_col = 1; id_col = 2
+            for (i = 1; i <= NF; i++) {
+                header = unquote($i)
+                if (header == "Name") name_col = i
+                else if (header == "ID") id_col = i
+            }
+        }
+        FILENAME == ARGV[1] {
+            name = unquote($name_col)
+            if (!(name in ids)) ids[name] = unquote($id_col)
+            next
+        }
+        FNR > 2 {
+            name = unquote($1)
+            if (name != "") print name "," ids[name]
+        }
+    ' "$CSV_MASTER_LIST" "$CSV_TO_ARCHIVE"
+}
+
 # Process CSV in batches of 50 with user confirmation
 process_csv_batches() {
-    local total_channels=$(tail -n +3 "$CSV_TO_ARCHIVE" | wc -l | tr -d ' ')
+    # Read both CSVs once up front; the total comes from the same pass
+    local resolved
+    resolved=$(resolve_channel_ids)
+    local total_channels=0
+    [[ -n "$resolved" ]] && total_channels=$(printf '%s\n' "$resolved" | wc -l | tr -d ' ')
     local batch_size=50
     local batch_number=1
     local processed=0
+    local skip_until=0
     
     echo "📊 Total channels to process: $total_channels"
     echo "📦 Processing in batches of $batch_size with user confirmation"
     echo "=============================================="
     
     # Process channels from CSV in batches of 50
-    tail -n +3 "$CSV_TO_ARCHIVE" | while IFS=',' read -r channel_name rest; do
+    printf '%s\n' "$resolved" | { while IFS=',' read -r channel_name channel_id; do
         # Skip empty lines
         [[ -z "$channel_name" ]] && continue
         
+        # Pass over the rest of a skipped batch without resolving or archiving
+        if (( processed < skip_until )); then
+            processed=$((processed + 1))
+            continue
+        fi
+        
         # Start new batch
         if (( processed % batch_size == 0 )); then
             if (( processed > 0 )); then
+                # Let the previous batch's archive jobs finish first
+                wait
                 echo ""
                 echo "📈 Batch $((batch_number - 1)) completed!"
                 echo ""
@@ -174,8 +312,14 @@ process_csv_batches() {
             
             if [[ "$DRY_RUN" != "true" ]]; then
                 echo "⚠️  Ready to archive next batch of $batch_size channels"
-                echo "   Type 'yes' to continue, 'skip' to skip this batch, or 'quit' to stop:"
-                read -r confirmation
+                if [[ "$AUTO_CONFIRM" == "true" ]]; then
+                    echo "   AUTO_CONFIRM=true - continuing without prompt"
+                    confirmation="yes"
+                else
+                    echo "   Type 'yes' to continue, 'skip' to skip this batch, or 'quit' to stop:"
+                    # stdin is the channel list here, so ask the terminal directly
+                    read -r confirmation </dev/tty
+                fi
                 
                 case "$confirmation" in
                     "yes"|"YES"|"y"|"Y")
@@ -183,10 +327,9 @@ process_csv_batches() {
                         ;;
                     "skip"|"SKIP"|"s"|"S")
                         echo "⏭️  Skipping batch $batch_number..."
-                        # Skip this entire batch
-                        for ((i = 0; i < batch_size && processed < total_channels; i++)); do
-                            ((processed++))
-                        done
+                        # Skip this entire batch (this row is its first channel)
+                        skip_until=$((processed + batch_size))
+                        processed=$((processed + 1))
                         ((batch_number++))
                         continue
                         ;;
@@ -196,9 +339,8 @@ process_csv_batches() {
                         ;;
                     *)
                         echo "❌ Invalid response. Skipping batch $batch_number..."
-                        for ((i = 0; i < batch_size && processed < total_channels; i++)); do
-                            ((processed++))
-                        done
+                        skip_until=$((processed + batch_size))
+                        processed=$((processed + 1))
                         ((batch_number++))
                         continue
                         ;;
@@ -208,27 +350,29 @@ process_csv_batches() {
             ((batch_number++))
         fi
         
-        ((processed++))
-        
-        # Find channel ID from master list
-        channel_id=$(grep "^$channel_name," "$CSV_MASTER_LIST" | cut -d',' -f2 | head -1 | tr -d '\r')
+        processed=$((processed + 1))
         
         if [[ -z "$channel_id" ]]; then
-            echo "[$processed/$total_channels] ❌ SKIP: $channel_name (ID not found)" | tee -a "$LOGFILE"
+            log "[$processed/$total_channels] ❌ SKIP: $channel_name (ID not found)"
             continue
         fi
         
         echo "[$processed/$total_channels] Processing: $channel_name -> $channel_id"
-        archive_channel "$channel_name" "$channel_id"
+        wait_for_slot
+        archive_channel "$channel_name" "$channel_id" &
         
-        # Rate limiting
-        sleep 0.5
+        # Rate limiting: space out request starts (~2 requests/second by default)
+        sleep "$RATE_LIMIT_DELAY"
     done
+    wait; }
     
     echo ""
     echo "📈 ALL CSV BATCHES COMPLETED"
 }
 
+# Open the log file once for the whole run (appended to via log)
+exec 3>>"$LOGFILE"
+
 # Main execution
 if [[ "$MODE" == "batch" ]]; then
     process_user_batch
@@ -252,5 +396,6 @@ echo "💡 Usage Examples:"
 echo "   User Batch (50 channels):     ./archive_channels.sh batch"
 echo "   CSV Batches (with confirms):  ./archive_channels.sh csv"  
 echo "   Dry Run:                      DRY_RUN=true ./archive_channels.sh batch"
+echo "   Unattended CSV run:           AUTO_CONFIRM=true ./archive_channels.sh csv"
 echo ""
 echo "📝 For batch mode: Populate USER_BATCH_50[] array with your 50 channel IDs"
\ No newline at end of file